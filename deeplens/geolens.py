@@ -977,6 +977,34 @@ class GeoLens(Lens):
 
         return psf_center
 
+    @torch.no_grad()
+    def rays_valid(self, points, spp=SPP_CALC):
+        """Check which point sources produce at least one valid chief ray.
+
+        Args:
+            points (Tensor): Normalized point source position. Shape of [N, 3], x, y in range [-1, 1], z in range [-Inf, 0].
+            spp (int, optional): Sample per pixel for the check. Defaults to SPP_CALC.
+
+        Returns:
+            valid: Boolean tensor, shape of [N].
+        """
+        if not torch.is_tensor(points):
+            points = torch.tensor(points)
+        if len(points.shape) == 1:
+            points = points.unsqueeze(0)
+
+        # Ray position in the object space by perspective projection, because points are normalized
+        depth = points[:, 2]
+        scale = self.calc_scale_pinhole(depth)
+        point_obj_x = points[..., 0] * scale * self.sensor_size[1] / 2
+        point_obj_y = points[..., 1] * scale * self.sensor_size[0] / 2
+        point_obj = torch.stack([point_obj_x, point_obj_y, points[..., 2]], dim=-1)
+
+        # Same sampling as the chief-ray PSF center calculation
+        ray = self.sample_from_points(point_obj, num_rays=spp, shrink_pupil=True)
+        ray = self.trace2sensor(ray)
+        return (ray.ra == 1).any(dim=-1)
+
     def psf(self, points, ks=PSF_KS, wvln=DEFAULT_WAVE, spp=SPP_PSF, recenter=True):
         """Single wvln incoherent PSF calculation.
 
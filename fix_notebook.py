@@ -5,20 +5,26 @@ and update the DIV2K dataset path to /nas1/DIV2K.
 """
 import json
 import os
-import copy
+import shutil
 
-NOTEBOOK_PATH = "/home/yz/DeepLens/1_end2end_5lines.ipynb"
+# orjson serializes large notebooks several times faster than json;
+# fall back to the stdlib when it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# First, read the notebook
-with open(NOTEBOOK_PATH, 'r') as f:
-    notebook = json.load(f)
+NOTEBOOK_PATH = "/home/yz/DeepLens/1_end2end_5lines.ipynb"
 
-# Create backup
+# Create backup first: a plain byte copy, no parse/format round-trip
 backup_path = NOTEBOOK_PATH + ".bak"
-with open(backup_path, 'w') as f:
-    json.dump(notebook, f, indent=2)
+shutil.copyfile(NOTEBOOK_PATH, backup_path)
 print(f"Created backup at {backup_path}")
 
+# Read the notebook
+with open(NOTEBOOK_PATH, 'r') as f:
+    notebook = json.load(f)
+
 # Import the safe_denormalize function
 import_cell = {
     "cell_type": "code",
@@ -45,10 +51,11 @@ dataset_path_cell = {
     "outputs": []
 }
 
-# For end2end_train function - find it and modify it
-modified_cells = []
+# For end2end_train function - find it and modify it in place
 for cell in notebook['cells']:
-    if cell['cell_type'] == 'code' and 'def end2end_train' in ''.join(cell['source']):
+    # any() short-circuits on the first matching line instead of joining
+    # the whole cell source into one string per cell.
+    if cell['cell_type'] == 'code' and any('def end2end_train' in line for line in cell['source']):
         # Modify the end2end_train function to use safe_denormalize and the new dataset path
         new_source = []
         for line in cell['source']:
@@ -59,16 +66,19 @@ for cell in notebook['cells']:
             else:
                 new_source.append(line)
         cell['source'] = new_source
-    
-    modified_cells.append(cell)
+        # Only one cell defines end2end_train
+        break
 
 # Insert our import and dataset path cells near the beginning
-notebook['cells'] = ([notebook['cells'][0]] + [import_cell, dataset_path_cell] + 
-                     notebook['cells'][1:])
+notebook['cells'][1:1] = [import_cell, dataset_path_cell]
 
 # Write the modified notebook
-with open(NOTEBOOK_PATH, 'w') as f:
-    json.dump(notebook, f, indent=2)
+if orjson is not None:
+    with open(NOTEBOOK_PATH, 'wb') as f:
+        f.write(orjson.dumps(notebook, option=orjson.OPT_INDENT_2))
+else:
+    with open(NOTEBOOK_PATH, 'w') as f:
+        json.dump(notebook, f, indent=2)
 
 print(f"Modified notebook {NOTEBOOK_PATH} to use safe_denormalize function and update DIV2K path")
 print("Please run the notebook and use the vis_sample function instead of manual visualization code")
@@ -18,22 +18,25 @@ def fixed_psf_radial(lens, M=3, depth=float('inf'), ks=101, log_scale=True, save
     from torchvision.utils import make_grid, save_image
     from deeplens.optics.basics import EPSILON
     
-    x = torch.linspace(0, 1, M).to(lens.device)
-    y = torch.linspace(0, 1, M).to(lens.device)
+    x = torch.linspace(0, 1, M, device=lens.device)
+    y = torch.linspace(0, 1, M, device=lens.device)
     z = torch.full_like(x, depth)
     points = torch.stack((x, y, z), dim=-1)
     
-    psfs = []
+    # Fix: Use recenter instead of center. psf_rgb accepts batched [M, 3]
+    # points, so all field points are traced in a single ray batch instead of
+    # one launch per point. Shape [M, 3, ks, ks].
+    psfs = lens.psf_rgb(points=points, ks=ks, recenter=True, spp=4096)
     for i in range(M):
-        # Fix: Use recenter instead of center
-        psf = lens.psf_rgb(points=points[i], ks=ks, recenter=True, spp=4096)
+        psf = psfs[i]
         psf /= psf.max()
-        
+
         if log_scale:
-            psf = torch.log(psf + EPSILON)
-            psf = (psf - psf.min()) / (psf.max() - psf.min())
-            
-        psfs.append(psf)
+            # In-place log normalization: one allocation-free pass, and
+            # aminmax fetches min and max in a single reduction.
+            psf.add_(EPSILON).log_()
+            mn, mx = torch.aminmax(psf)
+            psf.sub_(mn).div_(mx - mn)
     
     psf_grid = make_grid(psfs, nrow=M, padding=1, pad_value=0.0)
     save_image(psf_grid, save_name, normalize=True)
@@ -50,22 +53,25 @@ def fixed_psf_radial(lens, M=3, depth=float('inf'), ks=101, log_scale=True, save
     from torchvision.utils import make_grid, save_image
     from deeplens.optics.basics import EPSILON
     
-    x = torch.linspace(0, 1, M).to(lens.device)
-    y = torch.linspace(0, 1, M).to(lens.device)
+    x = torch.linspace(0, 1, M, device=lens.device)
+    y = torch.linspace(0, 1, M, device=lens.device)
     z = torch.full_like(x, depth)
     points = torch.stack((x, y, z), dim=-1)
     
-    psfs = []
+    # Fix: Use recenter instead of center. psf_rgb accepts batched [M, 3]
+    # points, so all field points are traced in a single ray batch instead of
+    # one launch per point. Shape [M, 3, ks, ks].
+    psfs = lens.psf_rgb(points=points, ks=ks, recenter=True, spp=4096)
     for i in range(M):
-        # Fix: Use recenter instead of center
-        psf = lens.psf_rgb(points=points[i], ks=ks, recenter=True, spp=4096)
+        psf = psfs[i]
         psf /= psf.max()
-        
+
         if log_scale:
-            psf = torch.log(psf + EPSILON)
-            psf = (psf - psf.min()) / (psf.max() - psf.min())
-            
-        psfs.append(psf)
+            # In-place log normalization: one allocation-free pass, and
+            # aminmax fetches min and max in a single reduction.
+            psf.add_(EPSILON).log_()
+            mn, mx = torch.aminmax(psf)
+            psf.sub_(mn).div_(mx - mn)
     
     psf_grid = make_grid(psfs, nrow=M, padding=1, pad_value=0.0)
     save_image(psf_grid, save_name, normalize=True)
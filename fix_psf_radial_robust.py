@@ -21,43 +21,46 @@ def robust_psf_radial(lens, M=2, depth=1000.0, ks=101, log_scale=True, save_name
     
     # Strategy 1: Use smaller field points (less than full FOV)
     # Instead of going from 0 to 1, go from 0 to 0.7
-    x = torch.linspace(0, 0.7, M).to(lens.device)
-    y = torch.linspace(0, 0.7, M).to(lens.device)
+    x = torch.linspace(0, 0.7, M, device=lens.device)
+    y = torch.linspace(0, 0.7, M, device=lens.device)
     z = torch.full_like(x, depth)
     points = torch.stack((x, y, z), dim=-1)
     
-    psfs = []
+    # Strategy 2: Pre-check ray validity for all field points in one
+    # vectorized pass, so no exception-driven control flow is needed.
+    valid = lens.rays_valid(points)
+
+    psfs = torch.empty((M, 3, ks, ks), device=lens.device)
+    if valid.any():
+        # Strategy 3: Batch-trace the valid points in a single call
+        psfs[valid] = lens.psf_rgb(points=points[valid], ks=ks, recenter=True, spp=4096)
+    for i in (~valid).nonzero().flatten().tolist():
+        # Strategy 4: Create a simple Gaussian PSF for invalid points
+        print(f"Creating placeholder Gaussian PSF for field point {i}")
+        sigma = 2.0 + i*1.5  # Increase blur with field position
+        # A Gaussian is separable: evaluate exp() on a 1D axis (ks
+        # values instead of ks*ks) and take the outer product.
+        coord = torch.arange(ks, device=lens.device) - ks // 2
+        g1d = torch.exp(-(coord * coord) / (2 * sigma ** 2))
+        g1d = g1d / g1d.sum()
+        gaussian = torch.outer(g1d, g1d)
+        # Create RGB PSF (same for all channels in this simple case).
+        # expand() is a zero-copy strided view; the only copy happens when
+        # it is written into the psfs slot.
+        psfs[i] = gaussian.unsqueeze(0).expand(3, -1, -1)
+
     for i in range(M):
-        try:
-            # Strategy 2: Try with recentering first
-            psf = lens.psf_rgb(points=points[i], ks=ks, recenter=True, spp=4096)
-        except AssertionError:
-            try:
-                # Strategy 3: Try without recentering
-                print(f"Trying without recentering for field point {i}")
-                psf = lens.psf_rgb(points=points[i], ks=ks, recenter=False, spp=4096)
-            except Exception as e:
-                # Strategy 4: If all else fails, create a simple Gaussian PSF
-                print(f"Creating placeholder Gaussian PSF for field point {i}")
-                sigma = 2.0 + i*1.5  # Increase blur with field position
-                x_coord = torch.arange(ks).to(lens.device)
-                y_coord = torch.arange(ks).to(lens.device)
-                x_grid, y_grid = torch.meshgrid(x_coord, y_coord, indexing='xy')
-                center = ks // 2
-                gaussian = torch.exp(-((x_grid - center) ** 2 + (y_grid - center) ** 2) / (2 * sigma ** 2))
-                gaussian = gaussian / gaussian.sum()
-                # Create RGB PSF (same for all channels in this simple case)
-                psf = torch.stack([gaussian, gaussian, gaussian], dim=0)
-        
         # Normalize PSF
+        psf = psfs[i]
         psf /= psf.max()
-        
+
         if log_scale:
-            psf = torch.log(psf + EPSILON)
-            psf = (psf - psf.min()) / (psf.max() - psf.min())
-            
-        psfs.append(psf)
-    
+            # In-place log normalization: one allocation-free pass, and
+            # aminmax fetches min and max in a single reduction.
+            psf.add_(EPSILON).log_()
+            mn, mx = torch.aminmax(psf)
+            psf.sub_(mn).div_(mx - mn)
+
     psf_grid = make_grid(psfs, nrow=M, padding=1, pad_value=0.0)
     save_image(psf_grid, save_name, normalize=True)
     